@@ -1,7 +1,7 @@
 from __future__ import annotations
 from collections.abc import Iterable
 from ..status import list_dependent_files
-from ..config import Config, read_config, get_input_files
+from ..config import Config, read_config, iter_input_files
 from ..io import FileCache
 from pathlib import Path
 
@@ -49,7 +49,7 @@ def rich_status():
         Panel(config_table, title="config", border_style="dark_cyan"),
         Columns(
             [
-                files_panel(get_input_files(fs, cfg), "input files"),
+                files_panel(iter_input_files(fs, cfg), "input files"),
                 files_panel(list_dependent_files(), "dependent files"),
             ]
         ),
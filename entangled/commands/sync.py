@@ -1,7 +1,9 @@
 from enum import Enum
+from pathlib import Path
 
-from ..io import filedb, FileCache, transaction
-from ..interface import Document
+from ..io import AbstractFileCache, filedb, FileCache, transaction
+from ..io.filedb import FILEDB_PATH
+from ..interface import Context, Document
 from ..errors.user import UserError
 
 from .main import main
@@ -15,13 +17,13 @@ class Action(Enum):
     STITCH = 2
 
 
-def sync_action(doc: Document) -> Action:
-    input_file_list = doc.input_files()
-
+def sync_action(doc: Document, changed_paths: set[Path] | None = None) -> Action:
+    """Decide wether to tangle or stitch. If `changed_paths` is given, only
+    those files are checked against the file database."""
     with filedb(readonly=True, fs=doc.context.fs) as db:
-        changed = set(db.changed_files(doc.context.fs))
+        changed = set(db.changed_files(doc.context.fs, changed_paths))
 
-        if not all(f in db for f in input_file_list):
+        if not all(f in db for f in doc.input_files()):
             return Action.TANGLE
 
         if not changed:
@@ -41,7 +43,7 @@ def sync_action(doc: Document) -> Action:
 
 
 def tangle(doc: Document):
-    with transaction() as t:
+    with transaction(fs=doc.context.fs) as t:
         doc.load(t)
         doc.tangle(t)
         t.clear_orphans()
@@ -50,19 +52,30 @@ def tangle(doc: Document):
 
 
 def stitch(doc: Document):
-    with transaction() as t:
+    with transaction(fs=doc.context.fs) as t:
         doc.load(t)
         doc.load_all_code(t)
         doc.stitch(t)
-    with transaction() as t:
+    with transaction(fs=doc.context.fs) as t:
         doc.tangle(t)
         for h in doc.context.all_hooks:
             h.post_tangle(doc.reference_map)
 
 
-def run_sync():
-    doc = Document()
-    match sync_action(doc):
+def run_sync(changed_paths: set[Path] | None = None, fs: AbstractFileCache | None = None):
+    """Run a sync. When `fs` is kept alive between calls, `changed_paths`
+    should list the files that changed since the last call; these are
+    invalidated in the cache and are the only ones checked for changes."""
+    if fs is None:
+        fs = FileCache()
+    if changed_paths is not None:
+        fs.invalidate(changed_paths)
+    # The watcher doesn't report changes in `.entangled`, but the database may
+    # be rewritten by another process or by version control.
+    fs.invalidate([FILEDB_PATH])
+
+    doc = Document(context=Context(fs=fs))
+    match sync_action(doc, changed_paths):
         case Action.TANGLE:
             logging.info("Tangling.")
             tangle(doc)
@@ -1,3 +1,5 @@
+from pathlib import Path
+
 import rich_click as click
 
 from .main import main
@@ -28,11 +30,15 @@ def do_tangle(*,
     annotate: AnnotationMethod | None = None,
     mode: TransactionMode = TransactionMode.FAIL,
     fs: AbstractFileCache | None = None,
+    changed: set[Path] | None = None,
     skip_post_tangle: bool = True):
-    """Tangle codes from the documentation."""
+    """Tangle codes from the documentation. When a long-lived `fs` is passed,
+    `changed` lists the files that need to be read again."""
 
     if fs is None:
         fs = FileCache()
+    if changed is not None:
+        fs.invalidate(changed)
 
     doc = Document(context=Context(fs=fs))
 
@@ -1,22 +1,96 @@
-from threading import Event
+from collections.abc import Callable, Generator, Iterable
+from contextlib import closing
+from typing import TYPE_CHECKING
+from queue import Queue, Empty
+from threading import Event, Thread
 from pathlib import Path
 
+from ..io import FileCache
 from ..status import find_watch_dirs
 from ..logging import logger
 
 from .sync import run_sync
 from .main import main
 
-import watchfiles
+# `watchfiles` loads a compiled extension; only import it when watching.
+if TYPE_CHECKING:
+    import watchfiles
 
 
 log = logger()
 
 
-def watch_filter(change: watchfiles.Change, path: str) -> bool:
-    if Path(path).relative_to(Path.cwd()).as_posix().startswith(".entangled"):
-        return False
-    return True
+type FileChange = tuple[watchfiles.Change, str]
+
+
+def coalesce(*watches: Callable[[Event], Iterable[set[FileChange]]], window: float = 0.2) -> Generator[set[FileChange]]:
+    """Merge batches of changes that arrive in quick succession. The batches
+    are produced by each `watch(stop_event)` on a separate thread; once a batch
+    arrives, any further batches that follow within `window` seconds are
+    merged into it. This stops when any of the watches ends. The stop event is
+    set when this generator is closed or interrupted, after which the producer
+    threads are joined."""
+    queue: Queue[set[FileChange] | None] = Queue()
+    stop_event = Event()
+
+    def produce(watch: Callable[[Event], Iterable[set[FileChange]]]):
+        try:
+            for batch in watch(stop_event):
+                queue.put(batch)
+        finally:
+            queue.put(None)
+
+    producers = [Thread(target=produce, args=(watch,)) for watch in watches]
+    for producer in producers:
+        producer.start()
+
+    try:
+        done = not producers
+        while not done and (changes := queue.get()) is not None:
+            while True:
+                try:
+                    more = queue.get(timeout=window)
+                except Empty:
+                    break
+                if more is None:
+                    done = True
+                    break
+                changes |= more
+            yield changes
+    finally:
+        stop_event.set()
+        for producer in producers:
+            producer.join()
+
+
+class AnyEvent:
+    """Is set when any of the given events is set. This is all that `watchfiles`
+    needs from a stop event."""
+    def __init__(self, *events: Event | None):
+        self.events = [e for e in events if e is not None]
+
+    def is_set(self) -> bool:
+        return any(e.is_set() for e in self.events)
+
+
+def watch_paths(
+        paths: Iterable[Path], stop_event: AnyEvent, ignore_paths: Iterable[Path] = (),
+        recursive: bool = True, only: Iterable[Path] | None = None) -> Iterable[set[FileChange]]:
+    """Watch `paths`, recursively by default. If `only` is given, changes to
+    other files are ignored. `watchfiles` collects a burst of changes into one
+    batch, until it sees no change for 50ms, or for at most its default
+    debounce of 1.6s."""
+    import watchfiles
+
+    default_filter = watchfiles.DefaultFilter(ignore_paths=list(ignore_paths))
+    only_paths = None if only is None else {str(p) for p in only}
+
+    def watch_filter(change: watchfiles.Change, path: str) -> bool:
+        return (only_paths is None or path in only_paths) and default_filter(change, path)
+
+    return watchfiles.watch(
+        *paths, stop_event=stop_event, watch_filter=watch_filter, recursive=recursive,
+        step=50, rust_timeout=0)
 
 
 def _watch(_stop_event: Event | None = None, _start_event: Event | None = None):
@@ -28,17 +102,50 @@ def _watch(_stop_event: Event | None = None, _start_event: Event | None = None):
         return _stop_event is not None and _stop_event.is_set()
 
     log.debug("Running daemon")
-    run_sync()
+    fs = FileCache()
+    run_sync(fs=fs)
 
     if _start_event is not None:
         log.debug("Setting start event")
         _start_event.set()
 
-    dirs = "."  # find_watch_dirs()
-
-    for changes in watchfiles.watch(dirs, stop_event=_stop_event, watch_filter=watch_filter):
-        log.debug(changes)
-        run_sync()
+    # Watch absolute paths, so that reported paths can be matched by prefix.
+    cwd = Path.cwd()
+
+    while not stop():
+        # Only watch the roots of the watch list and the directories of managed
+        # files. When these change, the watcher is restarted.
+        dirs = find_watch_dirs(fs) or {Path(".")}
+        log.debug("watching %s", [str(d) for d in dirs])
+        restart = Event()
+
+        # A watch on a file itself is lost when an editor saves by renaming a new
+        # file over it. Files are watched through their directory instead.
+        files = {d for d in dirs if not (cwd / d).is_dir()}
+
+        def watch_dirs(stop_event: Event):
+            return watch_paths([cwd / d for d in dirs - files], AnyEvent(_stop_event, restart, stop_event),
+                               ignore_paths=[cwd / ".entangled"])
+
+        def watch_files(stop_event: Event):
+            return watch_paths({cwd / f.parent for f in files}, AnyEvent(_stop_event, restart, stop_event),
+                               recursive=False, only=[cwd / f for f in files])
+
+        watches = ([watch_dirs] if dirs - files else []) + ([watch_files] if files else [])
+
+        # Close explicitly, so that the watcher threads are stopped on any exception.
+        with closing(coalesce(*watches)) as batches:
+            for changes in batches:
+                log.debug(changes)
+                run_sync({Path(p).relative_to(cwd) for _, p in changes}, fs)
+                if find_watch_dirs(fs) != dirs:
+                    restart.set()
+
+        if restart.is_set():
+            log.debug("watched directories changed, restarting watcher")
+            # Changes may have been missed while restarting.
+            fs.reset()
+            run_sync(fs=fs)
 
 
 @main.command()
@@ -4,12 +4,12 @@ defaults and config loaded from `entangled.toml` in the work directory.
 
 from __future__ import annotations
 
+from collections.abc import Generator
 from pathlib import Path
 from typing import Any
 from itertools import chain
 
 import msgspec
-import tomllib
 
 from .annotation_method import AnnotationMethod
 from .markers import Markers
@@ -25,6 +25,12 @@ from ..io import AbstractFileCache
 log = logger()
 
 
+# Parsed config sections, keyed by path and section, together with the digest of
+# the content they were parsed from. In `watch` mode the same config file is read
+# on every sync; only the latest version of each file is kept.
+_toml_cache: dict[tuple[Path, str | None], tuple[str, ConfigUpdate | None]] = {}
+
+
 def read_config_from_toml(
     fs: AbstractFileCache, path: Path, section: str | None = None
 ) -> ConfigUpdate | None:
@@ -41,21 +47,31 @@ def read_config_from_toml(
     """
     if path not in fs:
         return None
+
+    key = (path, section)
+    digest = fs[path].stat.hexdigest
+    if key in _toml_cache and _toml_cache[key][0] == digest:
+        return _toml_cache[key][1]
+
     try:
         content = fs[path].content
-        json: Any = tomllib.loads(content)
-        if section is not None:
+        if section is None:
+            update = msgspec.toml.decode(content, type=ConfigUpdate)
+        else:
+            json: Any = msgspec.toml.decode(content)
             for s in section.split("."):
                 json = json[s]  # pyright: ignore[reportAny]
-        update = msgspec.convert(json, type=ConfigUpdate)
+            update = msgspec.convert(json, type=ConfigUpdate)
         log.debug("Read config from `%s`", path)
+        _toml_cache[key] = (digest, update)
         return update
 
-    except (msgspec.ValidationError, tomllib.TOMLDecodeError) as e:
+    except msgspec.DecodeError as e:
         raise HelpfulUserError(f"Could not read config: {e}")
     except KeyError as e:
         log.debug("%s", str(e))
         log.debug("The config file %s should contain a section %s", path, section)
+        _toml_cache[key] = (digest, None)
         return None
 
 
@@ -78,14 +94,27 @@ def read_config(fs: AbstractFileCache) -> ConfigUpdate | None:
     return None
 
 
+def iter_input_files(fs: AbstractFileCache, cfg: Config) -> Generator[Path]:
+    """
+    Iterate over all input files for this project, in the order in which they
+    are found. A file matching more than one pattern in the watch list is only
+    given once.
+    """
+    log.debug("watch list: %s; ignoring: %s", cfg.watch_list, cfg.ignore_list)
+    ignore = cfg.ignore_pattern
+    seen: set[Path] = set()
+    for p in chain.from_iterable(map(fs.glob, cfg.watch_list)):
+        if p in seen or (ignore is not None and ignore.match(p.as_posix())):
+            continue
+        seen.add(p)
+        yield p
+
+
 def get_input_files(fs: AbstractFileCache, cfg: Config) -> list[Path]:
     """
     Get a sorted list of all input files for this project.
     """
-    log.debug("watch list: %s; ignoring: %s", cfg.watch_list, cfg.ignore_list)
-    input_file_list = sorted(filter(
-        lambda p: not any(p.match(pat) for pat in cfg.ignore_list),
-        chain.from_iterable(map(fs.glob, cfg.watch_list))))
+    input_file_list = sorted(iter_input_files(fs, cfg))
     log.debug("input file list %s", input_file_list)
     return input_file_list
 
@@ -2,15 +2,19 @@ from __future__ import annotations
 
 from copy import copy
 from dataclasses import dataclass, field
+from functools import cached_property
 from .version import Version
 from .language import Language, languages
 from .markers import Markers, default_markers
 from .annotation_method import AnnotationMethod
 from .namespace_default import NamespaceDefault
 from .config_update import ConfigUpdate, prefab_config
+from .ignore_list import compile_ignore_list
 
 from brei import Program
 
+import re
+
 
 @dataclass(frozen=True)
 class Config:
@@ -34,6 +38,9 @@ class Config:
             indicating markdown source locations.
         hooks: List of enabled hooks.
         hook: Sub-config of hooks.
+
+        parallel: Wether to read Markdown sources in parallel, when there
+            are several megabytes of them and more than one CPU.
     """
     version: Version = Version((2, 0))
     languages: dict[str, Language] = field(default_factory=lambda: {
@@ -55,6 +62,13 @@ class Config:
     hook: dict[str, object] = field(default_factory=dict)
     brei: Program = field(default_factory=Program)
 
+    parallel: bool = True
+
+    @cached_property
+    def ignore_pattern(self) -> re.Pattern[str] | None:
+        """The `ignore_list` compiled to a single regex, see `compile_ignore_list`."""
+        return compile_ignore_list(self.ignore_list)
+
     def get_language(self, lang_id: str) -> Language | None:
         return self.languages.get(lang_id, None)
 
@@ -89,6 +103,7 @@ class Config:
 
         hook = x.hook if update.hook is None else x.hook | update.hook
         brei = x.brei if update.brei is None else update.brei
+        parallel = x.parallel if update.parallel is None else update.parallel
 
         hooks = copy(x.hooks)
         for uh in update.hooks:
@@ -102,4 +117,4 @@ class Config:
         return Config(
             version, languages, markers, watch_list, ignore_list,
             annotation_format, annotation, use_line_directives,
-            namespace_default, namespace, hooks, hook, brei)
+            namespace_default, namespace, hooks, hook, brei, parallel)
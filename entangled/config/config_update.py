@@ -27,6 +27,7 @@ class ConfigUpdate(Struct):
         hooks: additive, prepend a `~` character to disable a hook).
         hook: merged with `|` operator (overrides one deep).
         brei: overrides (TODO: implement merge, requires updating Brei).
+        parallel: overrides.
     """
     version: str
     style: DocumentStyle | None = None
@@ -45,6 +46,8 @@ class ConfigUpdate(Struct):
     hook: dict[str, object] | None = None
     brei: Program | None = None
 
+    parallel: bool | None = None
+
 
 prefab_config: dict[DocumentStyle, ConfigUpdate] = {
     DocumentStyle.DEFAULT: ConfigUpdate(
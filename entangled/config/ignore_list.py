@@ -0,0 +1,25 @@
+from pathlib import PurePath
+
+import glob
+import os
+import re
+
+
+def compile_ignore_list(patterns: list[str]) -> re.Pattern[str] | None:
+    """
+    Combine a list of glob patterns into a single regex, matching the POSIX form
+    of a path in the same way as `PurePath.match` would for any of the patterns:
+    relative patterns match from the right, and `**` acts like `*`. Returns `None`
+    if there are no patterns.
+    """
+    flags = 0 if os.path.normcase("Aa") == "Aa" else re.IGNORECASE
+    alternatives: list[str] = []
+    for pat in patterns:
+        if not pat:
+            continue
+        pure = PurePath(pat)
+        expr = glob.translate(pure.as_posix(), recursive=False, include_hidden=True, seps="/")
+        alternatives.append(expr if pure.anchor else f"(?s:.*/)?{expr}")
+    if not alternatives:
+        return None
+    return re.compile("|".join(f"(?:{a})" for a in alternatives), flags)
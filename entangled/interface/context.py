@@ -6,9 +6,11 @@ from collections.abc import Generator, Iterable
 from ..io import AbstractFileCache, FileCache
 from ..config import Config, ConfigUpdate
 from ..hooks import HookBase, hooks, create_hook
-from ..model import Content, ReferenceMap
+from ..model import Content, RawContent, ReferenceMap
 from ..readers.yaml_header import get_config
 from ..readers import read_yaml_header, process_token, collect_plain_text, raw_markdown, InputStream, run_reader
+from ..readers.types import RawMarkdownStream
+from ..iterators import run_generator
 
 from functools import partial
 from ..logging import logger
@@ -20,41 +22,60 @@ class Context:
     fs: AbstractFileCache = field(default_factory=FileCache)
     config: Config = Config()
     _hook_states: dict[str, HookBase.State] = field(default_factory=dict)
-    _hooks: dict[str, HookBase] = field(default_factory=dict)
+    # Hook instances are created on first use, and shared with derived contexts.
+    # An instance is reused as long as the config for that hook doesn't change.
+    # Which hooks are active is still decided by the config of each context.
+    _hooks: dict[str, tuple[object, HookBase | None]] = field(default_factory=dict)
 
-    def __post_init__(self):
-        log.debug(f"context: hook config: {self.config.hook}")
-        for h in self.config.hooks:
-            if h not in self._hook_states:
-                self._hook_states[h] = hooks[h].State()
+    def __or__(self, update: ConfigUpdate | None) -> Context:
+        return Context(self.fs, self.config | update, self._hook_states, self._hooks)
 
-            log.debug("context: loading hook %s", h)
-            hook = create_hook(self.config, h, self._hook_states[h])
-            if hook is None:
-                continue
-            self._hooks[h] = hook
+    def _hook(self, h: str) -> HookBase | None:
+        hook_config = self.config.hook.get(h, {})
+        if h in self._hooks and self._hooks[h][0] == hook_config:
+            return self._hooks[h][1]
 
-    def __or__(self, update: ConfigUpdate | None) -> Context:
-        return Context(self.fs, self.config | update, self._hook_states)
+        if h not in self._hook_states and h in hooks:
+            self._hook_states[h] = hooks[h].State()
+
+        log.debug("context: loading hook %s", h)
+        hook = create_hook(self.config, h, self._hook_states.get(h, HookBase.State()))
+        self._hooks[h] = (hook_config, hook)
+        return hook
 
     @property
     def hooks(self) -> list[HookBase]:
-        return sorted((self._hooks[h] for h in self.config.hooks),
+        return sorted((hook for h in self.config.hooks if (hook := self._hook(h)) is not None),
                       key=lambda h: h.priority())
 
     @property
     def all_hooks(self) -> Iterable[HookBase]:
-        return self._hooks.values()
+        return [hook for h in self.config.hooks if (hook := self._hook(h)) is not None]
 
 
-def markdown(context: Context, refs: ReferenceMap, input: InputStream) -> Generator[Content, None, ConfigUpdate | None]:
+def raw_markdown_document(config: Config, input: InputStream) -> RawMarkdownStream[ConfigUpdate | None]:
+    """Read a Markdown document into plain text and code blocks, without running
+    hooks or registering references. Returns the config update found in the
+    YAML header."""
     header = yield from read_yaml_header(input)
     update = get_config(header)
+
+    yield from collect_plain_text(raw_markdown(config | update, input))
+
+    return update
+
+
+def process_markdown(context: Context, refs: ReferenceMap, tokens: Iterable[RawContent]) -> Generator[Content]:
+    """Run hooks on the code blocks in `tokens` and register them in `refs`.
+    The `context` should already include the update from the YAML header."""
+    return (process_token(context.hooks, refs, token) for token in tokens)
+
+
+def markdown(context: Context, refs: ReferenceMap, input: InputStream) -> Generator[Content, None, ConfigUpdate | None]:
+    tokens, update = run_generator(raw_markdown_document(context.config, input))
     context |= update
 
-    yield from map(
-        partial(process_token, context.hooks, refs),
-        collect_plain_text(raw_markdown(context.config, input)))
+    yield from process_markdown(context, refs, tokens)
 
     return update
 
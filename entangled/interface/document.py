@@ -1,19 +1,107 @@
-from dataclasses import dataclass, field
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from functools import partial
 from pathlib import PurePath, Path
 
-from ..config import Config, ConfigUpdate, get_input_files, read_config, AnnotationMethod
-from ..model import ReferenceMap, tangle_ref, Content, content_to_text
+import multiprocessing
+import os
+import sys
+
+from ..config import Config, ConfigUpdate, get_input_files, iter_input_files, read_config, AnnotationMethod
+from ..model import ReferenceMap, tangle_ref, CodeBlock, Content, RawContent, content_to_text
 from ..io import AbstractFileCache, FileCache, Transaction
 from ..readers import code
 from ..iterators import numbered_lines, run_generator
 from ..logging import logger
 
-from .context import Context, markdown
+from .context import Context, raw_markdown_document, process_markdown
 
 
 log = logger()
 
 
+@dataclass
+class ParsedSource:
+    """Result of reading a Markdown source, before hooks are run."""
+    hexdigest: str
+    text: str
+    config: Config
+    tokens: list[RawContent]
+    update: ConfigUpdate | None
+
+
+# Sources that were read before, keyed by path. An entry is reused when the
+# digest, text and config all match; the text is compared as well, since
+# `hexdigest` ignores differences in line endings and trailing whitespace.
+_parsed_sources: dict[Path, ParsedSource] = {}
+
+
+# Total size in characters of the unread sources, below which reading them in
+# parallel doesn't pay off. Sequential parsing runs at about 1.5-2 MB/s, while
+# starting a pool of worker processes takes about half a second.
+PARALLEL_MIN_SIZE = 2_000_000
+
+
+def read_source(config: Config, path: Path, text: str) -> tuple[list[RawContent], ConfigUpdate | None]:
+    """Read a Markdown source into raw tokens. Runs in worker processes when
+    sources are read in parallel."""
+    return run_generator(raw_markdown_document(config, numbered_lines(path, text)))
+
+
+def cached_source(config: Config, path: Path, text: str, digest: str) -> ParsedSource | None:
+    cached = _parsed_sources.get(path)
+    if cached is not None and cached.hexdigest == digest \
+            and cached.text == text and cached.config == config:
+        return cached
+    return None
+
+
+def parse_source(config: Config, path: Path, text: str, digest: str) -> ParsedSource:
+    if (cached := cached_source(config, path, text, digest)) is not None:
+        log.debug("`%s` unchanged, skipping parse", path)
+        return cached
+
+    tokens, update = read_source(config, path, text)
+    parsed = ParsedSource(digest, text, config, tokens, update)
+    _parsed_sources[path] = parsed
+    return parsed
+
+
+def parse_sources_parallel(config: Config, sources: list[tuple[Path, str, str]]):
+    """Read sources that are not cached yet in a process pool, filling the cache.
+    This is only an optimization: if anything goes wrong, the sources are read
+    again one by one, so that errors are reported as usual."""
+    todo = [(path, text, digest) for path, text, digest in sources
+            if cached_source(config, path, text, digest) is None]
+    workers = os.process_cpu_count() or 1
+    if not todo or workers <= 1 or sum(len(text) for _, text, _ in todo) < PARALLEL_MIN_SIZE:
+        return
+
+    log.debug("reading %d sources in parallel", len(todo))
+    paths, texts, digests = zip(*todo)
+    context = multiprocessing.get_context("spawn" if sys.platform == "win32" else "forkserver")
+    try:
+        with ProcessPoolExecutor(workers, mp_context=context) as pool:
+            results = list(pool.map(partial(read_source, config), paths, texts,
+                                    chunksize=max(1, len(todo) // (4 * workers))))
+    except Exception as e:
+        log.warning("parallel read failed, continuing sequentially: %s", e)
+        return
+
+    for path, text, digest, (tokens, update) in zip(paths, texts, digests, results):
+        _parsed_sources[path] = ParsedSource(digest, text, config, tokens, update)
+
+
+def fresh_token(token: RawContent) -> RawContent:
+    """Hooks modify code blocks in place, so cached tokens are copied before use."""
+    match token:
+        case CodeBlock():
+            return replace(token, properties=list(token.properties))
+        case _:
+            return token
+
+
 @dataclass
 class Document:
     context: Context = field(default_factory=Context)
@@ -31,8 +119,10 @@ class Document:
     def __post_init__(self):
         self.config |= read_config(self.context.fs)
 
-    def input_files(self):
-        return get_input_files(self.context.fs, self.config)
+    def input_files(self) -> Iterator[Path]:
+        """Iterate over input files, unsorted. Use `get_input_files` where the
+        order matters."""
+        return iter_input_files(self.context.fs, self.config)
 
     def source_text(self, path: Path) -> tuple[str, set[PurePath]]:
         deps: set[PurePath] = set()
@@ -58,10 +148,12 @@ class Document:
         t.write(path, text, map(Path, deps), main_block.mode)
 
     def load_source(self, t: Transaction, path: Path) -> ConfigUpdate | None:
-        reader = markdown(self.context, self.reference_map, numbered_lines(path, t.read(path)))
-        content, update = run_generator(reader)
+        parsed = parse_source(self.config, path, t.read(path), t.fs[path].stat.hexdigest)
+        update = parsed.update
         log.debug("got config update: %s", update)
-        self.content[path] = content
+        context = self.context | update
+        self.content[path] = list(process_markdown(
+            context, self.reference_map, map(fresh_token, parsed.tokens)))
         t.update(path)
         return update
 
@@ -85,9 +177,16 @@ class Document:
             self.context |= self.load_source(t, files[0])
         else:
             log.debug("multiple input files")
+            if self.config.parallel:
+                parse_sources_parallel(self.config, [
+                    (p, t.read(p), t.fs[p].stat.hexdigest) for p in files])
             for p in files:
                 self.load_source(t, p)
 
+        # Forget sources that were removed or renamed.
+        for p in _parsed_sources.keys() - set(files):
+            del _parsed_sources[p]
+
     def tangle(self, t: Transaction, annotation: AnnotationMethod | None = None):
         if annotation is None:
             annotation = self.config.annotation
@@ -1,16 +1,19 @@
 from __future__ import annotations
-from collections.abc import Generator
+from collections.abc import Generator, Iterable
 from contextlib import contextmanager, nullcontext
-import json
+from datetime import datetime
 from pathlib import Path
-from typing import Any
 
 import msgspec
 from msgspec import Struct
 
 import logging
+import sys
 
-from filelock import FileLock
+if sys.platform == "win32":
+    from filelock import FileLock
+else:
+    import fcntl
 
 from entangled.errors.user import HelpfulUserError
 
@@ -49,9 +52,19 @@ class FileDB(Struct):
         the markdown, so is considered to be managed."""
         return {Path(p) for p in self.targets}
 
-    def changed_files(self, fs: AbstractFileCache) -> Generator[Path]:
-        return (Path(p) for p, known_stat in self.files.items()
-                if fs[Path(p)].stat != known_stat)
+    def changed_files(self, fs: AbstractFileCache, candidates: Iterable[Path] | None = None) -> Generator[Path]:
+        """List files whose stat differs from the one stored. If `candidates`
+        is given, only those paths are checked; files that were removed from
+        disk also count as changed in that case. A candidate that is not a
+        known file may be a directory that was moved or replaced, so the known
+        files below it are checked instead."""
+        if candidates is None:
+            return (Path(p) for p, known_stat in self.files.items()
+                    if fs[Path(p)].stat != known_stat)
+        paths: list[Path] = []
+        for c in candidates:
+            paths.extend([c] if c in self else (p for p in self if p.is_relative_to(c)))
+        return (p for p in paths if p not in fs or fs[p].stat != self[p])
 
     def create_target(self, fs: AbstractFileCache, path: Path):
         if path.is_absolute():
@@ -83,6 +96,18 @@ class FileDB(Struct):
     def check(self, path: Path, content: str) -> bool:
         return hexdigest(content) == self.files[path.as_posix()].hexdigest
 
+    def snapshot(self) -> tuple[set[str], dict[str, tuple[datetime, str]]]:
+        """A copy of the contents, to see if anything changed later on. Stats
+        compare by digest only, so the modification times are copied as well."""
+        return set(self.targets), \
+            {p: (s.modified, s.hexdigest) for p, s in self.files.items()}
+
+
+class FileDBVersion(Struct):
+    """Only the version field of the `FileDB`, to report the version of a
+    database that doesn't decode as a `FileDB`."""
+    version: str
+
 
 FILEDB_PATH =  Path(".") / ".entangled" / "filedb.json"
 FILEDB_LOCK_PATH = Path(".") / ".entangled" / "filedb.lock"
@@ -101,14 +126,20 @@ def read_filedb(fs: AbstractFileCache | None = None) -> FileDB:
 
     logging.debug("Reading FileDB")
     db_contents = fs[FILEDB_PATH].content
-    raw: Any = json.loads(db_contents)   # pyright: ignore[reportExplicitAny, reportAny]
-    if raw["version"] != __version__:
+    try:
+        db = msgspec.json.decode(db_contents, type=FileDB)
+        version = db.version
+    except msgspec.ValidationError:
+        # A database from another version may not fit the current schema.
+        version = msgspec.json.decode(db_contents, type=FileDBVersion).version
+        if version == __version__:
+            raise
+
+    if version != __version__:
         raise HelpfulUserError(
-            f"File database was created with a different version of Entangled ({raw["version"]}).\n" +
+            f"File database was created with a different version of Entangled ({version}).\n" +
             f"Run `entangled reset` to regenerate the database to version {__version__}.")
 
-    db = msgspec.convert(raw, type=FileDB)
-
     undead = list(filter(lambda p: not p.exists(), db))
     for path in undead:
         logging.warning(f"undead file `{path}` (found in db but not on drive)")
@@ -125,6 +156,24 @@ def write_filedb(db: FileDB, fs: AbstractFileCache | None = None):
     _ = fs.write(FILEDB_PATH, content)
 
 
+@contextmanager
+def file_lock(path: Path) -> Generator[None]:
+    """Hold an exclusive lock on `path` for the duration of the context. On
+    POSIX this is a blocking `flock`, which waits in the kernel instead of
+    polling like `FileLock` does."""
+    if sys.platform == "win32":
+        with FileLock(path):
+            yield
+        return
+
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
 @contextmanager
 def filedb(readonly: bool = False, writeonly: bool = False, virtual: bool = False, fs: AbstractFileCache | None = None):
     if fs is None:
@@ -134,11 +183,13 @@ def filedb(readonly: bool = False, writeonly: bool = False, virtual: bool = Fals
         yield new_db()
         return
 
-    lock = FileLock(ensure_parent(FILEDB_LOCK_PATH)) if fs.is_for_real() \
+    lock = file_lock(ensure_parent(FILEDB_LOCK_PATH)) if fs.is_for_real() \
         else nullcontext()
 
     with lock:
         db = read_filedb(fs) if not writeonly else new_db()
+        before = db.snapshot() if not (readonly or writeonly) and FILEDB_PATH in fs else None
         yield db
-        if not readonly:
+        # Most syncs in `watch` mode change nothing; skip encoding the db then.
+        if not readonly and db.snapshot() != before:
             write_filedb(db, fs)
@@ -10,6 +10,8 @@ import os
 import logging
 import time
 
+from msgspec import Struct
+
 
 def hexdigest(s: str) -> str:
     """Creates a MD5 hash digest from a string. Before hashing, the string has
@@ -19,8 +21,11 @@ def hexdigest(s: str) -> str:
     return hashlib.sha256(content).hexdigest()
 
 
-@dataclass
-class Stat:
+class Stat(Struct, gc=False):
+    """Modification time and content digest of a file. Two stats compare
+    equal when their digests match. This is a `Struct` rather than a
+    dataclass, as the `FileDB` holds one for every managed file; decoding
+    these is cheaper, and the GC doesn't need to track them."""
     modified: datetime
     hexdigest: str
 
@@ -42,20 +47,22 @@ class FileData:
 
     @staticmethod
     def from_path(path: Path) -> FileData | None:
-        stat: os.stat_result | None = None
+        # The file is opened once; the stat is taken from the open file, so that
+        # it belongs to the same version of the file as the content.
         for _ in range(5):
             try:
-                stat = os.stat(path)
+                f = open(path, "r", encoding="utf-8")
+                break
             except FileNotFoundError:
                 logging.warning("File `%s` not found.", path)
                 time.sleep(0.1)
-
-        if stat is None:
+        else:
             return None
 
-        with open(path, "r", encoding="utf-8") as f:
+        with f:
+            stat = os.fstat(f.fileno())
             content = f.read()
-            digest = hexdigest(content)
+        digest = hexdigest(content)
 
         return FileData(
             path,
@@ -5,13 +5,15 @@ A virtual file system layer to cache file reads and stats.
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from collections.abc import Iterable
+from collections.abc import Generator, Iterable
 from typing import override
 from dataclasses import dataclass, field
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 from datetime import datetime
 
+import glob
 import os
+import re
 import tempfile
 
 from .stat import hexdigest, stat, FileData, Stat
@@ -44,6 +46,65 @@ def atomic_write(target: Path, content: str, mode: int | None):
     os.replace(f.name, target)
 
 
+_MAGIC = re.compile(r"[*?[]")
+
+
+def split_glob(pattern: str) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """
+    Split a glob pattern into the leading path components that contain no
+    wildcards, and the rest.
+    """
+    parts = PurePosixPath(Path(pattern).as_posix()).parts
+    n_literal = 0
+    while n_literal < len(parts) and not _MAGIC.search(parts[n_literal]):
+        n_literal += 1
+    return parts[:n_literal], parts[n_literal:]
+
+
+def scan_glob(pattern: str) -> Generator[Path]:
+    """
+    Find files matching a glob `pattern` relative to the working directory,
+    using `os.scandir`. Unlike `Path.glob` followed by `Path.is_file`, this
+    doesn't need a `stat` call for every entry on most systems. The walk
+    starts at the literal prefix of the pattern, only goes as deep as the
+    pattern allows, and never enters `.entangled` directories. As with
+    `Path.glob`, symlinks to directories are followed for the segments before
+    the first `**`, but not while expanding `**`.
+    """
+    prefix, rest = split_glob(pattern)
+    if not rest:
+        if Path(pattern).is_file():
+            yield Path(pattern)
+        return
+
+    base = "/".join(prefix)
+    max_depth = None if "**" in rest else len(rest)
+    # Entries at depth `d` are matched by segment `rest[d - 1]`.
+    follow_depth = rest.index("**") if "**" in rest else len(rest)
+    flags = 0 if os.path.normcase("Aa") == "Aa" else re.IGNORECASE
+    match = re.compile(glob.translate(
+        "/".join(prefix + rest), recursive=True, include_hidden=True, seps="/"), flags).match
+
+    stack: list[tuple[str, int]] = [(base, 1)]
+    while stack:
+        directory, depth = stack.pop()
+        try:
+            with os.scandir(directory or ".") as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            rel = f"{directory}/{entry.name}" if directory else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=depth <= follow_depth):
+                    if entry.name != ".entangled" and (max_depth is None or depth < max_depth):
+                        stack.append((rel, depth + 1))
+                elif entry.is_file() and match(rel):
+                    yield Path(rel)
+            except OSError:
+                continue
+
+
 class AbstractFileCache(ABC):
     @classmethod
     @abstractmethod
@@ -73,6 +134,9 @@ class AbstractFileCache(ABC):
     def reset(self):
         pass
 
+    def invalidate(self, keys: Iterable[Path]):
+        pass
+
 
 @dataclass
 class VirtualFS(AbstractFileCache):
@@ -157,7 +221,7 @@ class FileCache(AbstractFileCache):
 
     @override
     def glob(self, pattern: str) -> Iterable[Path]:
-        return filter(Path.is_file, map(lambda p: p.relative_to(Path.cwd()), Path.cwd().glob(pattern)))
+        return scan_glob(pattern)
 
     @override
     def write(self, key: Path, content: str, mode: int | None = None):
@@ -184,3 +248,15 @@ class FileCache(AbstractFileCache):
         Reset the cache. Doesn't perform any IO.
         """
         self._data = {}
+
+    @override
+    def invalidate(self, keys: Iterable[Path]):
+        """
+        Forget cached data for the given paths, and for anything below them
+        in case they are directories, so that these are read again on next
+        access. Doesn't perform any IO.
+        """
+        keys = set(keys)
+        for key in [k for k in self._data
+                    if k in keys or any(k.is_relative_to(d) for d in keys)]:
+            del self._data[key]
@@ -1,6 +1,8 @@
 from collections.abc import Generator
 from pathlib import PurePath
 
+import io
+
 from ..text_location import TextLocation
 
 from .peekable import peekable
@@ -10,16 +12,16 @@ type InputToken = tuple[TextLocation, str]
 
 
 def lines(text: str) -> Generator[str]:
-    """Iterate over lines in text, preserving newlines."""
-    pos = 0
-    while (next_pos := text.find("\n", pos)) != -1:
-        yield text[pos:next_pos + 1]
-        pos = next_pos + 1
-    yield text[pos:]
+    """Iterate over lines in text, preserving newlines. Only `\\n` counts as a line
+    break, unlike `str.splitlines`. The last line is always yielded, even when
+    empty."""
+    yield from io.StringIO(text, newline="\n")
+    if not text or text.endswith("\n"):
+        yield ""
 
 
 @peekable
 def numbered_lines(filename: PurePath, text: str) -> Generator[InputToken]:
     """Iterate the lines in a file. Doesn't strip newlines."""
-    for n, line in enumerate(lines(text)):
-        yield (TextLocation(filename, n+1), line)
+    for n, line in enumerate(lines(text), start=1):
+        yield (TextLocation(filename, n), line)
@@ -1,3 +1,4 @@
+from collections.abc import Generator
 from typing import cast
 
 import logging
@@ -7,14 +8,14 @@ import msgspec
 from ..config import Config, ConfigUpdate
 from ..model import PlainText
 from ..errors.user import ParseError, HelpfulUserError
-from .types import InputStream, MarkdownStream
+from .types import InputStream
 from .delimiters import delimited_token_getter
 
 
 get_yaml_header_token = delimited_token_getter("---", "---")
 
 
-def read_yaml_header(input: InputStream) -> MarkdownStream[object]:
+def read_yaml_header(input: InputStream) -> Generator[PlainText, None, object]:
     """
     Reads the YAML header that can be found at the top of a Markdown document.
     """
@@ -1,6 +1,7 @@
 from collections.abc import Iterable
 from .io import AbstractFileCache, filedb, FileCache
-from .config import get_input_files, Config, read_config
+from .io.virtual import split_glob
+from .config import Config, read_config
 
 from pathlib import Path
 
@@ -16,16 +17,44 @@ def safe_glob(pattern: str) -> Iterable[Path]:
         return []
 
 
-def find_watch_dirs(fs: AbstractFileCache | None = None):
-    """List all directories that contain files that need watching."""
+def glob_root(pattern: str) -> Path:
+    """The path that contains everything matching a glob pattern: the pattern
+    itself if it has no wildcards, otherwise its literal directory prefix."""
+    prefix, _ = split_glob(pattern)
+    return Path(*prefix)
+
+
+def existing_ancestor(path: Path) -> Path:
+    """The path itself if it exists, otherwise its nearest existing ancestor."""
+    while not path.exists() and path != path.parent:
+        path = path.parent
+    return path
+
+
+def minimal_roots(paths: Iterable[Path]) -> set[Path]:
+    """Remove paths that are contained in one of the others."""
+    roots: set[Path] = set()
+    for p in sorted(paths, key=lambda p: len(p.parts)):
+        if not any(p.is_relative_to(r) for r in roots):
+            roots.add(p)
+    return roots
+
+
+def find_watch_dirs(fs: AbstractFileCache | None = None) -> set[Path]:
+    """List a minimal set of paths to watch recursively: the roots of the
+    patterns in the watch list, the directories of managed files, and the
+    config files. A root that doesn't exist yet is replaced by its nearest
+    existing ancestor, so that its creation is noticed."""
     if fs is None:
         fs = FileCache()
     cfg = Config() | read_config(fs)
-    input_file_list = get_input_files(fs, cfg)
-    markdown_dirs = set(p.parent for p in input_file_list)
+    markdown_roots = set(glob_root(pat) for pat in cfg.watch_list)
     with filedb(readonly=True, fs=fs) as db:
         code_dirs = set(p.parent for p in db.managed_files)
-    return code_dirs.union(markdown_dirs)
+    config_files = {Path("entangled.toml"), Path("pyproject.toml")}
+    return minimal_roots(
+        {existing_ancestor(p) for p in markdown_roots | code_dirs} |
+        {p for p in config_files if p.exists()})
 
 
 def list_dependent_files(fs: AbstractFileCache | None = None):
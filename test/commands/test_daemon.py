@@ -82,3 +82,42 @@ def test_daemon(tmp_path: Path):
             stop.set()
             t.join()
             time.sleep(0.1)
+
+
+def wait_for_text(filename, text, timeout=5):
+    start_time = time.time()
+    while time.time() - start_time < timeout:
+        if Path(filename).exists() and text in Path(filename).read_text():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+@pytest.mark.timeout(20)
+def test_daemon_file_root(tmp_path: Path):
+    """A file in the watch list is watched through its directory, so that
+    editors that save by renaming a new file over it are noticed."""
+    def save(n: int):
+        Path("README.tmp").write_text(f"``` {{.python file=src/out.py}}\nprint({n})\n```\n")
+        os.replace("README.tmp", "README.md")
+
+    with chdir(tmp_path):
+        Path("entangled.toml").write_text('version = "2.4"\nwatch_list = ["README.md"]\n')
+        save(0)
+        stop = threading.Event()
+        start = threading.Event()
+        t = threading.Thread(target=_watch, args=(stop, start))
+        try:
+            t.start()
+            start.wait()
+            assert wait_for_text("src/out.py", "print(0)")
+            # The watcher is only running shortly after the start event.
+            time.sleep(0.5)
+
+            save(1)
+            assert wait_for_text("src/out.py", "print(1)")
+            save(2)
+            assert wait_for_text("src/out.py", "print(2)")
+        finally:
+            stop.set()
+            t.join()
@@ -0,0 +1,51 @@
+from contextlib import chdir
+from pathlib import Path
+
+from entangled.commands.sync import run_sync
+from entangled.io import FileCache
+
+
+def test_filedb_changed_externally(tmp_path: Path):
+    """A daemon keeps its file cache between syncs, but should still notice
+    when another process rewrites the file database."""
+    with chdir(tmp_path):
+        Path("main.md").write_text(
+            "``` {.scheme file=hello.scm}\n" '(display "hello")\n' "```\n")
+        fs = FileCache()
+        run_sync(fs=fs)
+        assert Path("hello.scm").exists()
+        run_sync(set(), fs)
+
+        # Another process changes the source and tangles.
+        Path("main.md").write_text(
+            "``` {.scheme file=hello.scm}\n" '(display "goodbye")\n' "```\n")
+        run_sync()
+        run_sync({Path("main.md"), Path("hello.scm")}, fs)
+
+        # The user edits the generated code, which should be stitched.
+        code = Path("hello.scm").read_text().replace("goodbye", "bye")
+        Path("hello.scm").write_text(code)
+        run_sync({Path("hello.scm")}, fs)
+        assert '(display "bye")' in Path("main.md").read_text()
+
+
+def test_directory_replaced(tmp_path: Path):
+    """When a directory is swapped, the watcher only reports the directory.
+    Cached files below it should be read again."""
+    def write_docs(path: Path, n: int):
+        path.mkdir()
+        (path / "a.md").write_text(f"``` {{.python file=out.py}}\nprint({n})\n```\n")
+
+    with chdir(tmp_path):
+        Path("entangled.toml").write_text('version = "2.4"\nwatch_list = ["docs/*.md"]\n')
+        write_docs(Path("docs"), 1)
+        fs = FileCache()
+        run_sync(fs=fs)
+        run_sync(set(), fs)
+        assert "print(1)" in Path("out.py").read_text()
+
+        write_docs(Path("new"), 2)
+        Path("docs").rename("old")
+        Path("new").rename("docs")
+        run_sync({Path("docs")}, fs)
+        assert "print(2)" in Path("out.py").read_text()
@@ -0,0 +1,76 @@
+from collections.abc import Generator
+import time
+from threading import Event, Thread, Timer
+from pathlib import Path
+
+import pytest
+
+from watchfiles import Change
+
+from entangled.commands.watch import coalesce, watch_paths, AnyEvent, FileChange
+
+
+def test_coalesce():
+    def bursts(_: Event) -> Generator[set[FileChange]]:
+        yield {(Change.modified, "a.md")}
+        yield {(Change.modified, "b.md")}
+        time.sleep(0.2)
+        yield {(Change.added, "c.md")}
+
+    assert list(coalesce(bursts, window=0.1)) == [
+        {(Change.modified, "a.md"), (Change.modified, "b.md")},
+        {(Change.added, "c.md")}
+    ]
+
+
+def test_coalesce_several():
+    def one(_: Event) -> Generator[set[FileChange]]:
+        yield {(Change.modified, "a.md")}
+        time.sleep(0.5)
+
+    def other(_: Event) -> Generator[set[FileChange]]:
+        yield {(Change.modified, "entangled.toml")}
+        time.sleep(0.5)
+
+    assert list(coalesce(one, other, window=0.1)) == [
+        {(Change.modified, "a.md"), (Change.modified, "entangled.toml")}
+    ]
+
+
+def test_coalesce_empty():
+    assert list(coalesce(lambda _: iter([]))) == []
+
+
+@pytest.mark.timeout(10)
+def test_coalesce_stops_producer():
+    def forever(stop_event: Event) -> Generator[set[FileChange]]:
+        while not stop_event.is_set():
+            yield {(Change.modified, "a.md")}
+            time.sleep(0.3)
+
+    batches = coalesce(forever)
+    assert next(batches) == {(Change.modified, "a.md")}
+    batches.close()
+
+
+@pytest.mark.timeout(10)
+def test_coalesce_watchfiles(tmp_path: Path):
+    """A burst of writes to the same file, as reported by `watchfiles`, should
+    result in a single batch."""
+    def write_burst():
+        time.sleep(0.5)
+        for i in range(40):
+            (tmp_path / "a.md").write_text(str(i))
+            time.sleep(0.02)
+
+    timeout = Event()
+    timer = Timer(3.0, timeout.set)
+    writer = Thread(target=write_burst)
+    timer.start()
+    writer.start()
+
+    batches = list(coalesce(lambda stop_event: watch_paths([tmp_path], AnyEvent(stop_event, timeout))))
+    writer.join()
+
+    assert len(batches) == 1
+    assert {Path(p).name for _, p in batches[0]} == {"a.md"}
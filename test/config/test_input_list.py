@@ -1,4 +1,5 @@
-from entangled.config import Config, get_input_files
+from entangled.config import Config, get_input_files, iter_input_files
+from entangled.config.ignore_list import compile_ignore_list
 from pathlib import Path
 from contextlib import chdir
 
@@ -18,3 +19,31 @@ def test_input_files(tmpdir: Path):
         assert get_input_files(fs, Config(watch_list=["a/*"])) == [Path("a/x"), Path("a/y")]
         assert get_input_files(fs, Config(watch_list=["**/*"], ignore_list=["**/y"])) == \
             [Path("a/x"), Path("b/x")]
+
+
+def test_compile_ignore_list():
+    assert compile_ignore_list([]) is None
+    ignore = compile_ignore_list(["**/y", "*.txt"])
+    assert ignore
+    for path, ignored in [("a/y", True), ("y", False), ("a/b/y", True),
+                          ("notes.txt", True), ("a/notes.txt", True), ("a/x", False)]:
+        assert bool(ignore.match(path)) == ignored
+        assert any(Path(path).match(pat) for pat in ["**/y", "*.txt"]) == ignored
+
+
+def test_iter_input_files(tmpdir: Path):
+    tmpdir = Path(tmpdir)
+    (tmpdir / "a").mkdir()
+    (tmpdir / "a" / "x.md").touch()
+    (tmpdir / "b.md").touch()
+    with chdir(tmpdir):
+        fs = FileCache()
+        cfg = Config(watch_list=["**/*.md", "a/*.md"])
+        assert sorted(iter_input_files(fs, cfg)) == [Path("a/x.md"), Path("b.md")]
+        assert get_input_files(fs, cfg) == [Path("a/x.md"), Path("b.md")]
+
+
+def test_ignore_pattern_cached():
+    cfg = Config(ignore_list=["**/y"])
+    assert cfg.ignore_pattern is cfg.ignore_pattern
+    assert Config().ignore_pattern is None
@@ -1,4 +1,4 @@
-from entangled.config import read_config, read_config_from_toml, Config
+from entangled.config import read_config, read_config_from_toml, Config, _toml_cache
 from entangled.config.version import Version
 from entangled.errors.user import UserError
 
@@ -82,3 +82,19 @@ def test_entangled_toml_error(tmp_path: Path, caplog):
         with pytest.raises(UserError):
             fs = FileCache()
             _ = Config() | read_config(fs)
+
+
+def test_config_cache(tmp_path: Path):
+    (tmp_path / "entangled.toml").write_text(entangled_toml, encoding="utf-8")
+    with chdir(tmp_path):
+        fs = FileCache()
+        update = read_config(fs)
+        assert read_config(FileCache()) is update
+
+        fs.write(Path("entangled.toml"), entangled_toml.replace('"42"', '"43"'))
+        cfg = Config() | read_config(fs)
+        assert cfg.version == Version((43,))
+
+        # Only the latest version of the file is kept.
+        digest, _ = _toml_cache[(Path("./entangled.toml"), None)]
+        assert digest == fs[Path("entangled.toml")].stat.hexdigest
@@ -62,3 +62,20 @@ def test_shebang():
         md_content, _ = doc.source_text(Path("input.md"))
         assert md_content.strip() == t.fs[Path("input.md.modified")].content.strip()
 
+
+def test_shebang_reload():
+    """Loading the same source twice reuses the parse, but hooks should still
+    see a clean copy of each code block."""
+    ref = ReferenceId(ReferenceName((), "test.sh"), PurePath("input.md"), 0)
+
+    for _ in range(2):
+        doc = Document()
+        doc.config |= ConfigUpdate(version="2.4", hooks=["shebang"])
+
+        with transaction(fs=fs) as t:
+            doc.load_source(t, Path("input.md"))
+            assert doc.reference_map[ref].header == "#!/bin/bash" + eol
+            assert not doc.reference_map[ref].source.startswith("#!")
+
+            doc.load_code(t, Path("test.sh.modified"))
+            assert "Universe" in doc.reference_map[ref].source
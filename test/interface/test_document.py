@@ -1,8 +1,10 @@
 from pathlib import Path
 
+import pytest
+
 from entangled.io import VirtualFS, transaction
 from entangled.config import ConfigUpdate, AnnotationMethod
-from entangled.interface import Document
+from entangled.interface import Context, Document
 
 
 fs = VirtualFS.from_dict({
@@ -75,3 +77,75 @@ def test_document():
         fib_hs, _ = doc.target_text(Path("fib.hs"))
         assert fib_hs == fs[Path("fib_annot.hs")].content
 
+
+
+def test_parallel_load(monkeypatch: pytest.MonkeyPatch):
+    from entangled.interface import document
+
+    # Force the process pool, regardless of source size and machine.
+    monkeypatch.setattr(document, "PARALLEL_MIN_SIZE", 0)
+    monkeypatch.setattr(document.os, "process_cpu_count", lambda: 2)
+
+    sources = {
+        f"part{i:02}.md": f"# Part {i}\n\n``` {{.python #part{i}}}\nprint({i})\n```\n"
+        for i in range(20)}
+    sources["main.md"] = "``` {.python file=main.py}\n" + \
+        "".join(f"<<part{i}>>\n" for i in range(len(sources))) + "```\n"
+    parallel_fs = VirtualFS.from_dict(sources)
+
+    results: list[str] = []
+    for parallel in [True, False]:
+        document._parsed_sources.clear()
+        doc = Document(context=Context(fs=parallel_fs))
+        doc.config |= ConfigUpdate(version="2.4", parallel=parallel)
+        if parallel:
+            # The sequential fallback doesn't fill the cache; only the pool does.
+            document.parse_sources_parallel(doc.config, [
+                (p, parallel_fs[p].content, parallel_fs[p].stat.hexdigest)
+                for p in map(Path, sources)])
+            assert set(document._parsed_sources) == set(map(Path, sources))
+
+        with transaction(fs=parallel_fs) as t:
+            doc.load(t)
+            results.append(doc.target_text(Path("main.py"))[0])
+
+    assert results[0] == results[1]
+    assert "print(19)" in results[0]
+
+
+def test_context_hooks_reused():
+    context = Context(fs=fs) | ConfigUpdate(version="2.4", hooks=["shebang"])
+    shebang = context.hooks[0]
+
+    derived = context | ConfigUpdate(version="2.4", annotation=AnnotationMethod.NAKED)
+    assert derived.hooks[0] is shebang
+
+    changed = context | ConfigUpdate(version="2.4", hook={"shebang": {"unused": True}})
+    assert changed.hooks[0] is not shebang
+    assert list(changed.all_hooks) == [changed.hooks[0]]
+
+
+def test_header_hooks_stay_local():
+    """A hook enabled in the header of one file is only used for that file."""
+    header_fs = VirtualFS.from_dict({
+        "a.md": "---\nentangled:\n    version: \"2.4\"\n    hooks: [brei]\n---\n\n"
+                "``` {.python file=a.py}\nprint(1)\n```\n",
+        "b.md": "``` {.python file=b.py}\nprint(2)\n```\n"})
+    doc = Document(context=Context(fs=header_fs))
+    doc.config |= ConfigUpdate(version="2.4")
+    with transaction(fs=header_fs) as t:
+        doc.load(t)
+    assert [type(h).__module__ for h in doc.context.all_hooks] == ["entangled.hooks.shebang"]
+
+
+def test_parsed_sources_evicted():
+    from entangled.interface import document
+
+    sources = {"a.md": "``` {.python file=a.py}\nprint(1)\n```\n",
+               "b.md": "``` {.python file=b.py}\nprint(2)\n```\n"}
+    for names in [["a.md", "b.md"], ["a.md"]]:
+        source_fs = VirtualFS.from_dict({n: sources[n] for n in names})
+        doc = Document(context=Context(fs=source_fs))
+        with transaction(fs=source_fs) as t:
+            doc.load(t)
+        assert set(document._parsed_sources) == set(map(Path, names))
@@ -3,6 +3,7 @@ from entangled.io.filedb import filedb
 from time import sleep
 from pathlib import Path
 import pytest
+import sys
 from contextlib import chdir
 
 from entangled.io.virtual import FileCache
@@ -50,3 +51,56 @@ def test_filedb(example_files: Path):
             assert list(db.changed_files(fs)) == [Path("d")]
             db.update(fs, Path("d"))
             assert list(db.changed_files(fs)) == []
+
+
+def test_changed_candidates(example_files: Path):
+    with chdir(example_files):
+        fs = FileCache()
+        with filedb(fs=fs) as db:
+            for n in "abcd":
+                db.update(fs, Path(n))
+
+        fs.write(Path("c"), "moon")
+        fs.write(Path("d"), "venus")
+
+        with filedb(readonly=True, fs=fs) as db:
+            assert list(db.changed_files(fs, [Path("a"), Path("d")])) == [Path("d")]
+            assert list(db.changed_files(fs, [Path("x")])) == []
+
+
+def test_unchanged_not_written(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    filedb_module = sys.modules["entangled.io.filedb"]
+
+    writes: list[int] = []
+    write_filedb = filedb_module.write_filedb
+    monkeypatch.setattr(filedb_module, "write_filedb",
+                        lambda db, fs=None: writes.append(1) or write_filedb(db, fs))
+
+    (tmp_path / "a").write_text("hello")
+    with chdir(tmp_path):
+        fs = FileCache()
+        with filedb(fs=fs) as db:
+            db.update(fs, Path("a"))
+        assert writes
+
+        writes.clear()
+        with filedb(fs=fs) as db:
+            db.update(fs, Path("a"))
+        assert not writes
+
+        with filedb(fs=fs) as db:
+            db.create_target(fs, Path("a"))
+        assert writes
+
+
+def test_version_mismatch(tmp_path: Path):
+    from entangled.errors.user import HelpfulUserError
+
+    (tmp_path / ".entangled").mkdir()
+    with chdir(tmp_path):
+        for content in ['{"version": "0.1", "files": {}, "targets": []}',
+                        '{"version": "0.1", "files": []}']:
+            (tmp_path / ".entangled" / "filedb.json").write_text(content)
+            with pytest.raises(HelpfulUserError, match="0.1"):
+                with filedb(fs=FileCache()):
+                    pass
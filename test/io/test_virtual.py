@@ -0,0 +1,31 @@
+from pathlib import Path
+from contextlib import chdir
+
+from entangled.io.virtual import scan_glob
+
+
+def test_scan_glob(tmp_path: Path):
+    for name in ["a.md", "b.txt", "doc/c.md", "doc/sub/d.md", ".hidden/e.md", ".entangled/tmp/f.md"]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).touch()
+
+    with chdir(tmp_path):
+        for pattern in ["*.md", "doc/*.md", "doc/**/*.md", "*/*.md", "a.md", "doc", "missing/*.md"]:
+            expected = sorted(p for p in Path().glob(pattern) if p.is_file())
+            assert sorted(scan_glob(pattern)) == expected
+
+        assert sorted(scan_glob("**/*.md")) == \
+            [Path(".hidden/e.md"), Path("a.md"), Path("doc/c.md"), Path("doc/sub/d.md")]
+
+
+def test_scan_glob_symlinks(tmp_path: Path):
+    for name in ["target/d.md", "target/deep/e.md", "real/b.md"]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).touch()
+    (tmp_path / "sublink").symlink_to(tmp_path / "target")
+    (tmp_path / "real" / "innerlink").symlink_to(tmp_path / "target")
+
+    with chdir(tmp_path):
+        for pattern in ["*/*.md", "*/**/*.md", "sub*/**/*.md", "*/*/**/*.md", "**/*.md"]:
+            expected = sorted(p for p in Path().glob(pattern) if p.is_file())
+            assert sorted(scan_glob(pattern)) == expected
@@ -12,6 +12,7 @@ def test_lines():
     assert ll("a\nb") == ["a\n", "b"]
     assert ll("a\nb\n") == ["a\n", "b\n", ""]
     assert ll("a\r\nb\r\n") == ["a\r\n", "b\r\n", ""]
+    assert ll("a\rb\x0cc\n") == ["a\rb\x0cc\n", ""]
 
 
 def test_numbered_lines():
@@ -140,3 +140,12 @@ This is an error
 def test_eof():
     with pytest.raises(ParseError):
         _ = run_reader(read_top_level, eof_error)
+
+
+def test_deep_nesting():
+    depth = 2000
+    deep = "".join(f"# ~/~ begin <<a.md#b{i}>>[init]\n" for i in range(depth)) \
+        + "# ~/~ end\n" * depth
+    blocks, _ = run_reader(read_top_level, deep)
+    assert len(blocks) == depth
+    assert blocks[-1].content == "<<b1>>\n"
@@ -0,0 +1,25 @@
+from pathlib import Path
+from contextlib import chdir
+
+from entangled.status import glob_root, minimal_roots, find_watch_dirs
+
+
+def test_glob_root():
+    assert glob_root("**/*.md") == Path(".")
+    assert glob_root("docs/**/*.md") == Path("docs")
+    assert glob_root("docs/intro/*.md") == Path("docs/intro")
+    assert glob_root("README.md") == Path("README.md")
+
+
+def test_minimal_roots():
+    assert minimal_roots([Path("docs"), Path("docs/intro"), Path("src/a"), Path("src/b")]) == \
+        {Path("docs"), Path("src/a"), Path("src/b")}
+    assert minimal_roots([Path("src"), Path(".")]) == {Path(".")}
+
+
+def test_find_watch_dirs_missing_root(tmp_path: Path):
+    (tmp_path / "entangled.toml").write_text('version = "2.4"\nwatch_list = ["docs/*.md"]\n')
+    with chdir(tmp_path):
+        assert find_watch_dirs() == {Path(".")}
+        (tmp_path / "docs").mkdir()
+        assert find_watch_dirs() == {Path("docs"), Path("entangled.toml")}